@@ -1,56 +1,118 @@
 import os
 import time
+import uuid
+from typing import Callable
 from openai import OpenAI
 
+from app.errors import classify_llm_error
 from app.logger import get_logger
+from app.routing import Route, escalate_route, plan_route, usage_history
 
 log = get_logger()
 
+MAX_ATTEMPTS = 2
 
-def analyze_resume(prompt: str, temperature: float = 0.7, max_tokens: int = 1000) -> str:
-    api_key = os.getenv("OPENAI_API_KEY")
 
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is missing. Set it in your .env file.")
+def _complete(client: OpenAI, route: Route, prompt: str, temperature: float, request_id: str):
+    log.info("openai_request_start | request_id=%s | operation=%s | model=%s | prompt_chars=%d | temperature=%.2f | max_tokens=%d",request_id,route.operation,route.model,len(prompt),temperature,route.max_tokens,)
 
-    client = OpenAI(api_key=api_key)
+    start = time.perf_counter()
 
-    try:
-        model = "gpt-4o-mini"
-        prompt_chars = len(prompt)
-
-        log.info("openai_request_start | model=%s | prompt_chars=%d | temperature=%.2f | max_tokens=%d",model,prompt_chars,temperature,max_tokens,)
-
-        start = time.perf_counter()
-
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert resume reviewer with years of experience in HR and recruitment.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
+    response = client.chat.completions.create(
+        model=route.model,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert resume reviewer with years of experience in HR and recruitment.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=temperature,
+        max_tokens=route.max_tokens,
+        timeout=route.timeout_s,
+    )
+
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    finish_reason = response.choices[0].finish_reason
+
+    log.info("openai_request_end | request_id=%s | operation=%s | model=%s | duration_ms=%d | finish_reason=%s", request_id, route.operation, route.model, duration_ms, finish_reason)
+
+    usage = getattr(response, "usage", None)
+    if usage:
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        log.info(
+            "openai_usage | request_id=%s | operation=%s | model=%s | prompt_tokens=%s | completion_tokens=%s | total_tokens=%s | max_tokens=%d | budget_utilization=%.2f",
+            request_id,
+            route.operation,
+            route.model,
+            prompt_tokens,
+            completion_tokens,
+            getattr(usage, "total_tokens", None),
+            route.max_tokens,
+            (completion_tokens or 0) / route.max_tokens if route.max_tokens else 0.0,
         )
+        usage_history.record(route.operation, prompt_tokens, completion_tokens)
 
-        duration_ms = int((time.perf_counter() - start) * 1000)
+    return response.choices[0].message.content, finish_reason
 
-        log.info("openai_request_end | model=%s | duration_ms=%d", model, duration_ms)
 
-        usage = getattr(response, "usage", None)
-        if usage:
-            log.info(
-                "openai_usage | prompt_tokens=%s | completion_tokens=%s | total_tokens=%s",
-                getattr(usage, "prompt_tokens", None),
-                getattr(usage, "completion_tokens", None),
-                getattr(usage, "total_tokens", None),
-            )
+def analyze_resume(
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int | None = None,
+    operation: str = "analyze",
+    allow_cheap: bool = False,
+    accept: Callable[[str], bool] | None = None,
+) -> str:
+    """
+    Run one routed completion.
+
+    `accept` lets the caller reject an answer (e.g. one that misses the
+    analysis contract); a rejected or truncated answer is retried once on
+    the fallback model or with a larger budget, when the route allows it.
+    """
+    request_id = "-"
+    model = "-"
+
+    try:
+        # Inside the try so a missing key is logged with its error category.
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is missing. Set it in your .env file.")
 
-        return response.choices[0].message.content
+        client = OpenAI(api_key=api_key)
+        route = plan_route(operation, prompt, allow_cheap=allow_cheap)
+        if max_tokens is not None:
+            route = Route(route.operation, route.model, max_tokens, route.timeout_s, "explicit", route.fallback_model)
 
-    except Exception:
-        log.exception("openai_request_failed")
+        attempt = 1
+        while True:
+            log.info("llm_route | operation=%s | model=%s | max_tokens=%d | timeout_s=%.0f | source=%s",route.operation,route.model,route.max_tokens,route.timeout_s,route.source,)
+
+            request_id = uuid.uuid4().hex[:12]
+            model = route.model
+            content, finish_reason = _complete(client, route, prompt, temperature, request_id)
+            truncated = finish_reason == "length"
+            accepted = accept(content) if accept else True
+
+            if accepted and not truncated:
+                return content
+
+            next_route = escalate_route(route, truncated) if attempt < MAX_ATTEMPTS else None
+            if next_route is None:
+                return content
+
+            log.info("llm_route_escalated | operation=%s | from_model=%s | to_model=%s | truncated=%s | accepted=%s",route.operation,route.model,next_route.model,truncated,accepted,)
+            route = next_route
+            attempt += 1
+
+    except Exception as e:
+        log.exception(
+            "openai_request_failed | request_id=%s | operation=%s | model=%s | category=%s",
+            request_id,
+            operation,
+            model,
+            classify_llm_error(str(e) or e.__class__.__name__),
+        )
         raise
@@ -0,0 +1,15 @@
+LLM_ERROR_CATEGORIES = ("auth", "rate_limit", "quota", "missing_key", "other")
+
+
+def classify_llm_error(raw: str) -> str:
+    low = (raw or "").lower()
+
+    if "invalid_api_key" in low or "incorrect api key" in low or "401" in low:
+        return "auth"
+    if "rate limit" in low or "429" in low:
+        return "rate_limit"
+    if "insufficient_quota" in low or "quota" in low:
+        return "quota"
+    if "openai_api_key is missing" in low or "api_key is missing" in low:
+        return "missing_key"
+    return "other"
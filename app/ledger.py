@@ -0,0 +1,367 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from app.logger import get_logger
+
+log = get_logger()
+
+LEDGER_DB = Path("data") / "credits.db"
+
+BATCH_WINDOW_MS = 2
+MAX_BATCH = 256
+CACHE_TTL_S = 0.5
+BUSY_TIMEOUT_MS = 5000
+# A hold outliving this was abandoned (killed process, lost session) and is
+# refunded by the sweep; well above the slowest routed call plus its retry.
+RESERVATION_TTL_S = 600
+SWEEP_INTERVAL_S = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    user_id    TEXT PRIMARY KEY,
+    balance    INTEGER NOT NULL DEFAULT 0 CHECK (balance >= 0),
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    idempotency_key TEXT PRIMARY KEY,
+    user_id         TEXT NOT NULL,
+    kind            TEXT NOT NULL,   -- grant | reserve
+    amount          INTEGER NOT NULL CHECK (amount > 0),
+    status          TEXT NOT NULL,   -- committed | reserved | refunded
+    reason          TEXT,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_user_idx ON entries (user_id, created_at);
+CREATE INDEX IF NOT EXISTS entries_status_idx ON entries (status, updated_at);
+"""
+
+
+class LedgerError(RuntimeError):
+    pass
+
+
+class IdempotencyConflictError(LedgerError):
+    pass
+
+
+class InsufficientCreditsError(LedgerError):
+    pass
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across app crashes in WAL mode; only an OS crash or
+    # power loss can drop the last group of commits.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _balance(conn: sqlite3.Connection, user_id: str) -> int:
+    row = conn.execute("SELECT balance FROM accounts WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def _existing_entry(conn: sqlite3.Connection, key: str, user_id: str, kind: str, amount: int):
+    row = conn.execute(
+        "SELECT user_id, kind, amount, status FROM entries WHERE idempotency_key = ?", (key,)
+    ).fetchone()
+    if row and (row[0], row[1], row[2]) != (user_id, kind, amount):
+        raise IdempotencyConflictError(f"Idempotency key {key!r} was already used for a different operation")
+    return row
+
+
+def _op_grant(conn: sqlite3.Connection, now: float, user_id: str, amount: int, key: str, reason: str | None):
+    if not _existing_entry(conn, key, user_id, "grant", amount):
+        conn.execute(
+            "INSERT INTO accounts (user_id, balance, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance, updated_at = excluded.updated_at",
+            (user_id, amount, now),
+        )
+        conn.execute(
+            "INSERT INTO entries VALUES (?, ?, 'grant', ?, 'committed', ?, ?, ?)",
+            (key, user_id, amount, reason, now, now),
+        )
+    return (user_id,), True
+
+
+def _op_reserve(conn: sqlite3.Connection, now: float, user_id: str, amount: int, key: str, reason: str | None):
+    existing = _existing_entry(conn, key, user_id, "reserve", amount)
+    if existing and existing[3] != "refunded":
+        return (user_id,), True
+
+    cur = conn.execute(
+        "UPDATE accounts SET balance = balance - ?, updated_at = ? WHERE user_id = ? AND balance >= ?",
+        (amount, now, user_id, amount),
+    )
+    if cur.rowcount == 0:
+        return (user_id,), False
+
+    if existing:
+        # A retried action whose earlier hold was refunded (interrupted run,
+        # expired hold) takes the hold again under the same key.
+        conn.execute("UPDATE entries SET status = 'reserved', updated_at = ? WHERE idempotency_key = ?", (now, key))
+    else:
+        conn.execute(
+            "INSERT INTO entries VALUES (?, ?, 'reserve', ?, 'reserved', ?, ?, ?)",
+            (key, user_id, amount, reason, now, now),
+        )
+    return (user_id,), True
+
+
+def _op_commit(conn: sqlite3.Connection, now: float, key: str):
+    row = conn.execute("SELECT user_id, status FROM entries WHERE idempotency_key = ? AND kind = 'reserve'", (key,)).fetchone()
+    if not row:
+        raise LedgerError(f"Unknown reservation {key!r}")
+
+    user_id, status = row
+    if status == "reserved":
+        conn.execute("UPDATE entries SET status = 'committed', updated_at = ? WHERE idempotency_key = ?", (now, key))
+    return (user_id,), status in ("reserved", "committed")
+
+
+def _op_refund(conn: sqlite3.Connection, now: float, key: str):
+    row = conn.execute(
+        "SELECT user_id, amount, status FROM entries WHERE idempotency_key = ? AND kind = 'reserve'", (key,)
+    ).fetchone()
+    if not row:
+        raise LedgerError(f"Unknown reservation {key!r}")
+
+    user_id, amount, status = row
+    if status == "reserved":
+        conn.execute("UPDATE accounts SET balance = balance + ?, updated_at = ? WHERE user_id = ?", (amount, now, user_id))
+        conn.execute("UPDATE entries SET status = 'refunded', updated_at = ? WHERE idempotency_key = ?", (now, key))
+    return (user_id,), status in ("reserved", "refunded")
+
+
+def _op_sweep(conn: sqlite3.Connection, now: float, ttl_s: float):
+    expired = conn.execute(
+        "SELECT idempotency_key, user_id, amount FROM entries WHERE status = 'reserved' AND updated_at < ?",
+        (now - ttl_s,),
+    ).fetchall()
+    for key, user_id, amount in expired:
+        conn.execute("UPDATE accounts SET balance = balance + ?, updated_at = ? WHERE user_id = ?", (amount, now, user_id))
+        conn.execute("UPDATE entries SET status = 'refunded', updated_at = ? WHERE idempotency_key = ?", (now, key))
+    if expired:
+        log.warning("credit_ledger_reservations_expired | count=%d", len(expired))
+    return tuple({user_id for _, user_id, _ in expired}), len(expired)
+
+
+class CreditLedger:
+    """
+    Persistent credit ledger on SQLite (WAL).
+
+    Writes are queued to a single writer thread per process, which applies
+    everything that arrives within `batch_window_ms` in one IMMEDIATE
+    transaction (group commit). Callers block until their batch is durable.
+    Across processes, SQLite's write lock serialises the batches.
+
+    Each write carries an idempotency key; replaying a key returns the
+    original outcome instead of charging or granting twice.
+
+    Holds still `reserved` after `reservation_ttl_s` are refunded by a sweep
+    the writer runs every `SWEEP_INTERVAL_S` (or on `sweep_expired`).
+    """
+
+    def __init__(
+        self,
+        path: Path | str = LEDGER_DB,
+        batch_window_ms: float = BATCH_WINDOW_MS,
+        max_batch: int = MAX_BATCH,
+        cache_ttl_s: float = CACHE_TTL_S,
+        reservation_ttl_s: float = RESERVATION_TTL_S,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_window_s = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.cache_ttl_s = cache_ttl_s
+        self.reservation_ttl_s = reservation_ttl_s
+
+        conn = _connect(self.path)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._local = threading.local()
+        self._cache: dict[str, tuple[int, float]] = {}
+        self._cache_lock = threading.Lock()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="credit-ledger-writer", daemon=True)
+        self._writer.start()
+
+    # reads
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def balance(self, user_id: str) -> int:
+        value = _balance(self._reader(), user_id)
+        self._cache_put(user_id, value)
+        return value
+
+    def has_enough_credits(self, user_id: str, cost: int) -> bool:
+        """Fast path for UI gating; may lag other processes by up to `cache_ttl_s`. `reserve` is authoritative."""
+        if cost <= 0:
+            return True
+
+        with self._cache_lock:
+            cached = self._cache.get(user_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0] >= cost
+
+        return self.balance(user_id) >= cost
+
+    def history(self, user_id: str, limit: int = 50) -> list[dict]:
+        rows = self._reader().execute(
+            "SELECT idempotency_key, kind, amount, status, reason, created_at FROM entries "
+            "WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+        keys = ("idempotency_key", "kind", "amount", "status", "reason", "created_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _cache_put(self, user_id: str, value: int) -> None:
+        with self._cache_lock:
+            self._cache[user_id] = (value, time.monotonic() + self.cache_ttl_s)
+
+    # writes
+
+    def grant(self, user_id: str, amount: int, idempotency_key: str, reason: str | None = None) -> bool:
+        if amount <= 0:
+            raise ValueError("amount must be positive")
+        return self._submit(_op_grant, user_id, amount, idempotency_key, reason)
+
+    def reserve(self, user_id: str, amount: int, idempotency_key: str, reason: str | None = None) -> bool:
+        """Hold `amount` credits; returns False (and changes nothing) if the balance is too low."""
+        if amount <= 0:
+            raise ValueError("amount must be positive")
+        return self._submit(_op_reserve, user_id, amount, idempotency_key, reason)
+
+    def commit(self, idempotency_key: str) -> bool:
+        return self._submit(_op_commit, idempotency_key)
+
+    def refund(self, idempotency_key: str) -> bool:
+        return self._submit(_op_refund, idempotency_key)
+
+    def sweep_expired(self) -> int:
+        """Refund holds older than `reservation_ttl_s`; returns how many were refunded."""
+        return self._submit(_op_sweep, self.reservation_ttl_s)
+
+    def _submit(self, op, *args) -> bool:
+        if self._closed:
+            raise LedgerError("Ledger is closed")
+        future: Future = Future()
+        self._queue.put((op, args, future))
+        return future.result()
+
+    def _write_loop(self) -> None:
+        conn = _connect(self.path)
+        next_sweep = time.monotonic()
+
+        while True:
+            if time.monotonic() >= next_sweep:
+                self._apply_batch(conn, [(_op_sweep, (self.reservation_ttl_s,), Future())])
+                next_sweep = time.monotonic() + SWEEP_INTERVAL_S
+
+            try:
+                item = self._queue.get(timeout=max(0.0, next_sweep - time.monotonic()))
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window_s
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)
+                    break
+                batch.append(nxt)
+
+            self._apply_batch(conn, batch)
+
+        conn.close()
+
+    def _apply_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        outcomes = []
+        touched: set[str] = set()
+        now = time.time()
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, args, future in batch:
+                # A savepoint per op keeps one bad request from failing the batch.
+                conn.execute("SAVEPOINT op")
+                try:
+                    user_ids, result = op(conn, now, *args)
+                    conn.execute("RELEASE op")
+                    touched.update(user_ids)
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    outcomes.append((future, None, e))
+
+            balances = {uid: _balance(conn, uid) for uid in touched}
+            conn.execute("COMMIT")
+
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            log.exception("credit_ledger_batch_failed | size=%d", len(batch))
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for uid, value in balances.items():
+            self._cache_put(uid, value)
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_ledger: CreditLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> CreditLedger:
+    global _ledger
+
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CreditLedger(os.getenv("CREDITS_DB") or LEDGER_DB)
+        return _ledger
@@ -0,0 +1,224 @@
+import math
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.logger import LOG_FILE, get_logger
+
+log = get_logger()
+
+CHARS_PER_TOKEN = 4
+BUDGET_HEADROOM = 1.25
+MIN_LEARNED_SAMPLES = 20
+MAX_SAMPLES = 500
+
+CHEAP_MODEL = os.getenv("LLM_CHEAP_MODEL", "gpt-4.1-nano")
+CHEAP_FIRST = os.getenv("LLM_CHEAP_FIRST", "0").lower() in ("1", "true", "yes", "on")
+
+USAGE_LINE_RE = re.compile(
+    r"openai_usage \| (?:request_id=\S+ \| )?operation=(?P<operation>\w+) \| model=\S+ \| "
+    r"prompt_tokens=(?P<prompt>\d+) \| completion_tokens=(?P<completion>\d+)"
+)
+
+
+@dataclass(frozen=True)
+class RouteProfile:
+    model: str
+    default_tokens: int
+    min_tokens: int
+    max_tokens: int
+    timeout_s: float
+    # True when the output is roughly as long as the input (rewrite), so the
+    # budget is a ratio of prompt tokens rather than a fixed size.
+    scales_with_input: bool = False
+    default_ratio: float = 1.0
+
+
+@dataclass(frozen=True)
+class Route:
+    operation: str
+    model: str
+    max_tokens: int
+    timeout_s: float
+    source: str
+    fallback_model: str | None = None
+
+
+def _env_number(name: str, cast, default):
+    # Profiles are built at import, so a bad value must not take the app down.
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        value = None
+    if value is None or not 0 < value < math.inf:
+        log.error("llm_profile_invalid_env | %s=%r is not a positive %s; using %s", name, raw, cast.__name__, default)
+        return default
+    return value
+
+
+def _env_profile(operation: str, profile: RouteProfile) -> RouteProfile:
+    prefix = f"LLM_{operation.upper()}_"
+    return RouteProfile(
+        model=os.getenv(prefix + "MODEL", profile.model),
+        default_tokens=profile.default_tokens,
+        min_tokens=profile.min_tokens,
+        max_tokens=_env_number(prefix + "MAX_TOKENS", int, profile.max_tokens),
+        timeout_s=_env_number(prefix + "TIMEOUT", float, profile.timeout_s),
+        scales_with_input=profile.scales_with_input,
+        default_ratio=profile.default_ratio,
+    )
+
+
+PROFILES: dict[str, RouteProfile] = {
+    # The analysis contract is a handful of labelled lines and six bullets.
+    "analyze": _env_profile(
+        "analyze",
+        RouteProfile(model="gpt-4o-mini", default_tokens=450, min_tokens=250, max_tokens=800, timeout_s=30),
+    ),
+    # A rewrite restates the whole resume, so it needs room proportional to it.
+    "rewrite": _env_profile(
+        "rewrite",
+        RouteProfile(
+            model="gpt-4o-mini",
+            default_tokens=1500,
+            min_tokens=600,
+            max_tokens=6000,
+            timeout_s=120,
+            scales_with_input=True,
+            default_ratio=1.3,
+        ),
+    ),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text or "") / CHARS_PER_TOKEN))
+
+
+def _p95(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(0.95 * len(ordered))) - 1)]
+
+
+class UsageHistory:
+    """Recent (prompt_tokens, completion_tokens) per operation, seeded from the usage logs."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._samples: dict[str, deque] = {}
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._seeded = False
+
+    def record(self, operation: str, prompt_tokens: int | None, completion_tokens: int | None) -> None:
+        if not prompt_tokens or not completion_tokens:
+            return
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self._max_samples)).append(
+                (int(prompt_tokens), int(completion_tokens))
+            )
+
+    def samples(self, operation: str) -> list[tuple[int, int]]:
+        self._seed_once()
+        with self._lock:
+            return list(self._samples.get(operation, ()))
+
+    def _seed_once(self) -> None:
+        with self._lock:
+            if self._seeded:
+                return
+            self._seeded = True
+
+        # Oldest backup first, so the newest samples end up in the deques.
+        paths = [Path(f"{LOG_FILE}.{i}") for i in (3, 2, 1)] + [LOG_FILE]
+        seeded = 0
+        for path in paths:
+            try:
+                with path.open(encoding="utf-8", errors="ignore") as fh:
+                    for line in fh:
+                        m = USAGE_LINE_RE.search(line)
+                        if m:
+                            self.record(m["operation"], int(m["prompt"]), int(m["completion"]))
+                            seeded += 1
+            except FileNotFoundError:
+                continue
+
+        log.info("llm_usage_history_seeded | samples=%d", seeded)
+
+
+usage_history = UsageHistory()
+
+
+def plan_route(operation: str, prompt: str, allow_cheap: bool = False) -> Route:
+    """
+    Pick model, output budget and timeout for one call.
+
+    The budget is the p95 of observed completions (or of completion/prompt
+    ratios for input-proportional operations) with some headroom, once enough
+    samples exist; before that it falls back to the profile defaults.
+    """
+    profile = PROFILES.get(operation)
+    if profile is None:
+        raise ValueError(f"Unknown LLM operation: {operation!r}")
+
+    prompt_tokens = estimate_tokens(prompt)
+    samples = usage_history.samples(operation)
+    learned = len(samples) >= MIN_LEARNED_SAMPLES
+
+    if profile.scales_with_input:
+        ratio = _p95([c / p for p, c in samples]) if learned else profile.default_ratio
+        budget = prompt_tokens * ratio * BUDGET_HEADROOM
+        source = "learned_ratio" if learned else "input_estimate"
+    elif learned:
+        budget = _p95([c for _, c in samples]) * BUDGET_HEADROOM
+        source = "learned"
+    else:
+        budget = profile.default_tokens
+        source = "default"
+
+    max_tokens = int(min(profile.max_tokens, max(profile.min_tokens, math.ceil(budget))))
+
+    model = profile.model
+    fallback_model = None
+    if allow_cheap and CHEAP_FIRST and CHEAP_MODEL != profile.model:
+        model, fallback_model = CHEAP_MODEL, profile.model
+        source += "+cheap_first"
+
+    return Route(
+        operation=operation,
+        model=model,
+        max_tokens=max_tokens,
+        timeout_s=profile.timeout_s,
+        source=source,
+        fallback_model=fallback_model,
+    )
+
+
+def escalate_route(route: Route, truncated: bool) -> Route | None:
+    """Next attempt after a rejected answer: the fallback model, or a bigger budget if output was cut off."""
+    profile = PROFILES[route.operation]
+
+    if route.fallback_model:
+        return Route(
+            operation=route.operation,
+            model=route.fallback_model,
+            max_tokens=min(profile.max_tokens, route.max_tokens * 2) if truncated else route.max_tokens,
+            timeout_s=route.timeout_s,
+            source="fallback",
+        )
+
+    if truncated and route.max_tokens < profile.max_tokens:
+        return Route(
+            operation=route.operation,
+            model=route.model,
+            max_tokens=min(profile.max_tokens, route.max_tokens * 2),
+            timeout_s=route.timeout_s,
+            source="escalated",
+        )
+
+    return None
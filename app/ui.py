@@ -2,17 +2,49 @@ import streamlit as st
 import re
 import traceback
 import os
+import uuid
 
 from app.precheck import is_probably_resume
 from app.prompts import build_analyze_prompt, build_rewrite_prompt
 from app.file_parser import cached_extract_text, FileTooLargeError, MAX_UPLOAD_SIZE_MB
 from app.analyzer import analyze_resume
+from app.errors import classify_llm_error
+from app.ledger import get_ledger, InsufficientCreditsError
+from app.logger import get_logger
+
+log = get_logger()
+
+def get_user_id() -> str:
+    # The id lives in the URL so credits survive reloads and are shared by
+    # every tab opened on the same link.
+    user_id = st.query_params.get("uid")
+    if not user_id:
+        user_id = uuid.uuid4().hex
+        st.query_params["uid"] = user_id
+    return user_id
+
+def get_credits() -> int:
+    return get_ledger().balance(get_user_id())
 
 def has_enough_credits(cost: int) -> bool:
-    return st.session_state.get("credits", 0) >= cost
+    return get_ledger().has_enough_credits(get_user_id(), cost)
+
+def action_key(action: str) -> str:
+    # One idempotency key per paid action: a rerun that replays the same
+    # action (interrupted script, double submit) reuses it until
+    # finish_action() clears it, so the ledger charges it once. The action
+    # name carries the cost, since a key is bound to one amount.
+    state_key = f"idempotency_key_{action}"
+    if not st.session_state.get(state_key):
+        st.session_state[state_key] = f"{action}:{uuid.uuid4().hex}"
+    return st.session_state[state_key]
+
+def finish_action(action: str) -> None:
+    st.session_state.pop(f"idempotency_key_{action}", None)
 
-def spend_credits(cost: int) -> None:
-    st.session_state["credits"] -= cost
+def add_credits(amount: int, reason: str) -> None:
+    # Every click is a separate grant, so each gets its own key.
+    get_ledger().grant(get_user_id(), amount, idempotency_key=f"{reason}:{uuid.uuid4().hex}", reason=reason)
 
 CREDIT_POLICY = (
     """
@@ -88,18 +120,18 @@ DEBUG = os.getenv("DEBUG", "0").lower() in ("1", "true", "yes", "on")
 
 def show_llm_error(context: str, e: Exception) -> None:
     raw = str(e) or e.__class__.__name__
-    low = raw.lower()
+    category = classify_llm_error(raw)
 
-    if "invalid_api_key" in low or "incorrect api key" in low or "401" in low:
+    if category == "auth":
         user_msg = (
             "OpenAI authentication failed (invalid/missing API key). "
             "Check OPENAI_API_KEY in .env and restart Streamlit."
         )
-    elif "rate limit" in low or "429" in low:
+    elif category == "rate_limit":
         user_msg = "OpenAI rate limit exceeded. Please try again later."
-    elif "insufficient_quota" in low or "quota" in low:
+    elif category == "quota":
         user_msg = "OpenAI quota/billing issue. Check your OpenAI account."
-    elif "openai_api_key is missing" in low or "api_key is missing" in low:
+    elif category == "missing_key":
         user_msg = ("OPENAI_API_KEY is missing. Set it in your .env file and restart Streamlit.")
    
     else:
@@ -119,7 +151,6 @@ def run_app():
         layout="centered",
     )
 
-    st.session_state.setdefault("credits", 0)
     st.session_state.setdefault("purchase_clicks", 0)
     st.session_state.setdefault("ad_clicks", 0)
 
@@ -146,45 +177,71 @@ def run_app():
     credits_main_ph = st.empty() # placeholder
 
     def render_credits() -> None:
-        credits = st.session_state.get("credits", 0)
+        credits = get_credits()
         credits_sidebar_ph.write(f"Current credits: {credits}")
         credits_main_ph.write(f"Current credits: {credits}")
 
     render_credits()
 
-    def charge_credits(cost: int) -> int:
-        if cost and cost > 0:
-            spend_credits(cost)
-            render_credits()
-            return cost
-        return 0
-    
-    def refund_credits(cost: int) -> None:
-        if cost and cost > 0:
-            st.session_state["credits"] += cost
-            render_credits()
-        
+    def charge_credits(context: str, cost: int) -> str | None:
+        if not cost or cost <= 0:
+            return None
+
+        key = action_key(f"{context.lower()}_{cost}")
+        if not get_ledger().reserve(get_user_id(), cost, idempotency_key=key, reason=context):
+            raise InsufficientCreditsError(context)
+        render_credits()
+        return key
+
+    def commit_charge(context: str, cost: int, reservation: str) -> None:
+        if get_ledger().commit(reservation):
+            return
+        # The hold outlived the reservation TTL and was swept back to the
+        # balance while the call ran; take it again before committing.
+        if get_ledger().reserve(get_user_id(), cost, idempotency_key=reservation, reason=context) and get_ledger().commit(reservation):
+            return
+        log.warning("credit_charge_unpaid | key=%s | cost=%d | reason=hold_expired", reservation, cost)
+
     def run_llm_with_credits(context: str, cost: int, spinner_text: str, fn) -> object | None:
-        charged = charge_credits(cost)
+        action = f"{context.lower()}_{cost}"
+        try:
+            reservation = charge_credits(context, cost)
+        except InsufficientCreditsError:
+            finish_action(action)
+            st.error("You don't have enough credits. Please add credits and try again.")
+            return None
+
+        committed = False
         try:
             with st.spinner(spinner_text):
-                return fn()
+                result = fn()
+            if reservation:
+                commit_charge(context, cost, reservation)
+            committed = True
         except Exception as e:
-            refund_credits(charged)
+            finish_action(action)
             show_llm_error(context, e)
             return None
+        finally:
+            # Also runs for Streamlit's RerunException/StopException (BaseException)
+            # and a failed commit, so no path leaves the hold reserved.
+            if reservation and not committed:
+                get_ledger().refund(reservation)
+                render_credits()
+        finish_action(action)
+        return result
 
     with st.expander("Credit policy"):
         st.write(CREDIT_POLICY)
 
     if st.sidebar.button("Buy +10 credits",key="buy_credits_sidebar"):
-        st.session_state["credits"] += 10
+        add_credits(10, "purchase")
         st.session_state["purchase_clicks"] += 1
         st.sidebar.success("Credits added: +10")
         render_credits()
 
     if st.sidebar.button("Watch ad: +1 credit", key="watch_ad_sidebar"):
-        st.session_state["credits"] += 1
+        add_credits(1, "ad")
         st.session_state["ad_clicks"] += 1
         st.sidebar.success("Credits added: +1")
         render_credits()
@@ -195,14 +252,14 @@ def run_app():
 
     with col_buy:
         if st.button("Buy +10 credits", key="buy_credits_main"):
-            st.session_state["credits"] += 10
+            add_credits(10, "purchase")
             st.session_state["purchase_clicks"] += 1
             st.success("Credits added: +10")
             render_credits()
 
     with col_ad:
         if st.button("Watch ad: +1 credit", key="watch_ad_main"):
-            st.session_state["credits"] += 1
+            add_credits(1, "ad")
             st.session_state["ad_clicks"] += 1
             st.success("Credits added: +1")
             render_credits()
@@ -265,7 +322,13 @@ def run_app():
                             )
 
                             def _do_analyze():
-                                analysis = analyze_resume(prompt, temperature=temperature_analyze)
+                                analysis = analyze_resume(
+                                    prompt,
+                                    temperature=temperature_analyze,
+                                    operation="analyze",
+                                    allow_cheap=not analyze_cost,
+                                    accept=lambda text: parse_analysis_output(text)["primary_score"] is not None,
+                                )
                                 parsed = parse_analysis_output(analysis)
                                 return analysis, parsed
 
@@ -385,7 +448,7 @@ def run_app():
                                 prompt = build_rewrite_prompt(resume_text=resume_text, job_role=job_role)
 
                                 def _do_rewrite():
-                                    return analyze_resume(prompt, temperature=temperature_rewrite)
+                                    return analyze_resume(prompt, temperature=temperature_rewrite, operation="rewrite")
 
                                 rewritten = run_llm_with_credits("Rewrite", rewrite_cost, "Rewriting resume...", _do_rewrite)
 
@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.ledger import CreditLedger, IdempotencyConflictError
+from tools.ledger_stress import audit_balances, hammer, pending_holds
+
+USERS = ["alice", "bob", "carol"]
+INITIAL_CREDITS = 20
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = CreditLedger(tmp_path / "credits.db")
+    yield ledger
+    ledger.close()
+
+
+def test_concurrent_processes_and_threads_keep_balances_exact(tmp_path):
+    db_path = str(tmp_path / "credits.db")
+    setup = CreditLedger(db_path)
+    for user in USERS:
+        setup.grant(user, INITIAL_CREDITS, f"initial:{user}")
+    setup.close()
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=3, mp_context=ctx) as pool:
+        results = list(pool.map(hammer, [db_path] * 3, [USERS] * 3, [4] * 3, [150] * 3, range(3)))
+
+    # Threads in this process share the ledger with the worker processes.
+    results.append(hammer(db_path, USERS, 4, 150, 99))
+
+    check = CreditLedger(db_path)
+    try:
+        balances = {user: check.balance(user) for user in USERS}
+    finally:
+        check.close()
+
+    assert pending_holds(db_path) == 0
+    assert audit_balances(db_path, USERS) == balances
+    for user in USERS:
+        granted = INITIAL_CREDITS + sum(r["granted"][user] for r in results)
+        committed = sum(r["committed"][user] for r in results)
+        assert balances[user] == granted - committed
+    assert sum(r["rejected"] for r in results) > 0
+
+
+def test_replayed_keys_apply_once(ledger):
+    assert ledger.grant("alice", 10, "grant-1")
+    assert ledger.grant("alice", 10, "grant-1")
+    assert ledger.balance("alice") == 10
+
+    assert ledger.reserve("alice", 4, "charge-1")
+    assert ledger.reserve("alice", 4, "charge-1")
+    assert ledger.balance("alice") == 6
+
+    assert ledger.commit("charge-1")
+    assert ledger.commit("charge-1")
+    assert ledger.reserve("alice", 4, "charge-1")
+    assert ledger.balance("alice") == 6
+
+    with pytest.raises(IdempotencyConflictError):
+        ledger.reserve("alice", 5, "charge-1")
+
+
+def test_refund_after_commit_is_rejected(ledger):
+    ledger.grant("alice", 10, "grant-1")
+    ledger.reserve("alice", 4, "charge-1")
+    ledger.commit("charge-1")
+
+    assert ledger.refund("charge-1") is False
+    assert ledger.balance("alice") == 6
+    assert [e["status"] for e in ledger.history("alice") if e["kind"] == "reserve"] == ["committed"]
+
+
+def test_insufficient_balance_changes_nothing(ledger):
+    ledger.grant("alice", 3, "grant-1")
+
+    assert ledger.reserve("alice", 4, "charge-1") is False
+    assert ledger.balance("alice") == 3
+    assert [e["kind"] for e in ledger.history("alice")] == ["grant"]
+
+
+def test_refunded_hold_can_be_retried_under_same_key(ledger):
+    ledger.grant("alice", 10, "grant-1")
+    ledger.reserve("alice", 4, "charge-1")
+    assert ledger.refund("charge-1")
+    assert ledger.balance("alice") == 10
+
+    assert ledger.reserve("alice", 4, "charge-1")
+    assert ledger.balance("alice") == 6
+
+
+def test_expired_holds_are_swept(tmp_path):
+    ledger = CreditLedger(tmp_path / "credits.db", reservation_ttl_s=0.05)
+    try:
+        ledger.grant("alice", 10, "grant-1")
+        ledger.reserve("alice", 4, "stale")
+        time.sleep(0.1)
+        ledger.reserve("alice", 2, "fresh")
+
+        assert ledger.sweep_expired() == 1
+        assert ledger.balance("alice") == 8
+        assert ledger.commit("stale") is False
+        assert ledger.commit("fresh")
+    finally:
+        ledger.close()
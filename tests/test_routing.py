@@ -0,0 +1,79 @@
+from dataclasses import replace
+
+import pytest
+
+from app import routing
+from app.routing import MIN_LEARNED_SAMPLES, PROFILES, UsageHistory, escalate_route, plan_route
+
+
+@pytest.fixture
+def history(monkeypatch):
+    history = UsageHistory()
+    history._seeded = True  # keep the real log files out of the tests
+    monkeypatch.setattr(routing, "usage_history", history)
+    return history
+
+
+def test_analyze_budget_switches_to_learned_at_min_samples(history):
+    for _ in range(MIN_LEARNED_SAMPLES - 1):
+        history.record("analyze", 1000, 300)
+
+    route = plan_route("analyze", "resume text")
+    assert route.source == "default"
+    assert route.max_tokens == PROFILES["analyze"].default_tokens
+
+    history.record("analyze", 1000, 300)
+    route = plan_route("analyze", "resume text")
+    assert route.source == "learned"
+    assert route.max_tokens == 375  # p95 of 300 with 25% headroom
+
+
+def test_rewrite_budget_scales_with_prompt_and_is_capped(history):
+    profile = PROFILES["rewrite"]
+
+    short = plan_route("rewrite", "x" * 2000)
+    longer = plan_route("rewrite", "x" * 4000)
+    assert short.source == "input_estimate"
+    assert profile.min_tokens <= short.max_tokens < longer.max_tokens
+    assert longer.max_tokens == 1625  # 1000 prompt tokens * 1.3 ratio * 1.25 headroom
+
+    huge = plan_route("rewrite", "x" * 100_000)
+    assert huge.max_tokens == profile.max_tokens
+
+
+def test_cheap_first_fallback_doubles_budget_on_truncation(history, monkeypatch):
+    monkeypatch.setattr(routing, "CHEAP_FIRST", True)
+    profile = PROFILES["analyze"]
+    for _ in range(MIN_LEARNED_SAMPLES):
+        history.record("analyze", 1000, 300)
+
+    route = plan_route("analyze", "resume text", allow_cheap=True)
+    assert route.model == routing.CHEAP_MODEL
+    assert route.fallback_model == profile.model
+    assert route.max_tokens == 375
+
+    truncated = escalate_route(route, truncated=True)
+    assert truncated.model == profile.model
+    assert truncated.max_tokens == 750
+    assert truncated.fallback_model is None
+
+    capped = escalate_route(replace(route, max_tokens=600), truncated=True)
+    assert capped.max_tokens == profile.max_tokens
+
+    rejected = escalate_route(route, truncated=False)
+    assert rejected.max_tokens == route.max_tokens
+
+
+@pytest.mark.parametrize("cast", [int, float])
+@pytest.mark.parametrize("raw", ["0", "-5", "inf", "nan", "abc", "12k"])
+def test_env_number_rejects_invalid_values(monkeypatch, raw, cast):
+    monkeypatch.setenv("LLM_TEST_MAX_TOKENS", raw)
+    assert routing._env_number("LLM_TEST_MAX_TOKENS", cast, 800) == 800
+
+
+def test_env_number_accepts_positive_values(monkeypatch):
+    monkeypatch.setenv("LLM_TEST_MAX_TOKENS", "1200")
+    assert routing._env_number("LLM_TEST_MAX_TOKENS", int, 800) == 1200
+
+    monkeypatch.delenv("LLM_TEST_MAX_TOKENS")
+    assert routing._env_number("LLM_TEST_MAX_TOKENS", int, 800) == 800
@@ -0,0 +1,297 @@
+"""Micro-benchmarks for the CPU-bound stages.
+
+Covers PDF extraction, the resume precheck, prompt building and analysis
+output parsing/cleaning over a seeded synthetic corpus (`tools.corpus`).
+Results are written as JSON (pytest-benchmark-like layout) and can be
+compared against a stored baseline:
+
+    uv run python -m tools.bench --save .benchmarks/baseline.json
+    uv run python -m tools.bench --compare .benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from tools.corpus import generate_document, text_to_pdf
+from tools.mock_openai import build_analysis_body
+
+DEFAULT_SIZES = [2000, 8000, 32000]
+DEFAULT_THRESHOLD = 0.20
+# Sub-microsecond cases are run in an inner loop so one round lasts at least
+# this long; otherwise timer resolution and overhead dominate the numbers.
+MIN_ROUND_TIME = 0.001
+
+
+def calibrate_iterations(fn, min_round_time: float) -> int:
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time:
+            return iterations
+        # Aim slightly past the target so the next round usually clears it.
+        iterations = max(iterations * 2, int(iterations * min_round_time * 1.2 / elapsed) if elapsed > 0 else 0)
+
+
+def time_case(fn, min_time: float, max_rounds: int, warmup: int = 2, min_round_time: float = MIN_ROUND_TIME) -> dict:
+    """Per-call statistics; each round times `iterations` calls and is divided back down."""
+    for _ in range(warmup):
+        fn()
+
+    iterations = calibrate_iterations(fn, min_round_time)
+    timings: list[float] = []
+    deadline = time.perf_counter() + min_time
+
+    while len(timings) < max_rounds and (len(timings) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    mean = statistics.fmean(timings)
+    return {
+        "rounds": len(timings),
+        "iterations": iterations,
+        "min": min(timings),
+        "max": max(timings),
+        "mean": mean,
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "ops": 1 / mean if mean > 0 else None,
+    }
+
+
+def build_cases(seed: int, sizes: list[int]) -> list[tuple[str, str, dict, object]]:
+    from app.file_parser import extract_text_from_pdf
+    from app.precheck import is_probably_resume
+    from app.prompts import build_analyze_prompt, build_rewrite_prompt
+    from app.ui import clean_analysis_for_ui, parse_analysis_output
+
+    rng = random.Random(seed)
+    cases = []
+
+    for size in sizes:
+        docs = {kind: generate_document(rng, kind, size) for kind in ("resume", "paper", "thesis")}
+        resume = docs["resume"]
+        resume_pdf = text_to_pdf(resume)
+
+        # Analysis replies carry the resume-sized feedback a real model returns
+        # for long inputs, so parse/clean scale with the size parameter too.
+        analysis = build_analysis_body("Target role: Backend Engineer", score=72)
+        analysis += "\n\n" + "\n".join(f"- {line}" for line in resume.splitlines() if line.strip())
+
+        params = {"size": size}
+        cases += [
+            ("extract_text_from_pdf", f"pdf[{size}]", {**params, "pdf_bytes": len(resume_pdf)}, lambda b=resume_pdf: extract_text_from_pdf(b)),
+            ("is_probably_resume", f"resume[{size}]", params, lambda t=resume: is_probably_resume(t)),
+            ("is_probably_resume", f"paper[{size}]", params, lambda t=docs["paper"]: is_probably_resume(t)),
+            ("is_probably_resume", f"thesis[{size}]", params, lambda t=docs["thesis"]: is_probably_resume(t)),
+            ("build_analyze_prompt", f"role[{size}]", params, lambda t=resume: build_analyze_prompt(t, "Backend Engineer")),
+            ("build_analyze_prompt", f"general[{size}]", params, lambda t=resume: build_analyze_prompt(t, None)),
+            ("build_rewrite_prompt", f"role[{size}]", params, lambda t=resume: build_rewrite_prompt(t, "Backend Engineer")),
+            ("parse_analysis_output", f"reply[{size}]", params, lambda a=analysis: parse_analysis_output(a)),
+            ("clean_analysis_for_ui", f"reply[{size}]", params, lambda a=analysis: clean_analysis_for_ui(a)),
+        ]
+
+    return cases
+
+
+def run_benchmarks(
+    seed: int,
+    sizes: list[int],
+    min_time: float,
+    max_rounds: int,
+    only: str | None = None,
+    min_round_time: float = MIN_ROUND_TIME,
+) -> dict:
+    results = []
+    for group, name, params, fn in build_cases(seed, sizes):
+        if only and only not in group:
+            continue
+        results.append(
+            {
+                "group": group,
+                "name": f"{group}::{name}",
+                "params": params,
+                "stats": time_case(fn, min_time, max_rounds, min_round_time=min_round_time),
+            }
+        )
+
+    return {
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "machine_info": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "config": {
+            "seed": seed,
+            "sizes": sizes,
+            "min_time": min_time,
+            "max_rounds": max_rounds,
+            "min_round_time": min_round_time,
+            "only": only,
+        },
+        "benchmarks": results,
+    }
+
+
+def remeasure(report: dict, names: set[str], min_round_time: float = MIN_ROUND_TIME) -> None:
+    """Time `names` again and keep the faster median, so one slow stretch of the machine cannot fail the gate."""
+    config = report["config"]
+    for group, name, _params, fn in build_cases(config["seed"], config["sizes"]):
+        full_name = f"{group}::{name}"
+        if full_name not in names:
+            continue
+        stats = time_case(fn, config["min_time"], config["max_rounds"], min_round_time=min_round_time)
+        for bench in report["benchmarks"]:
+            if bench["name"] == full_name and stats["median"] < bench["stats"]["median"]:
+                bench["stats"] = stats
+
+
+def environment_mismatches(current: dict, baseline: dict) -> list[str]:
+    """Settings that make medians incomparable: run config (bar --only) and machine info."""
+    problems = []
+    for section, skip in (("config", {"only"}), ("machine_info", set())):
+        cur, base = current.get(section, {}), baseline.get(section, {})
+        for key in sorted((set(cur) | set(base)) - skip):
+            if cur.get(key) != base.get(key):
+                problems.append(f"{section}.{key}: baseline={base.get(key)!r} current={cur.get(key)!r}")
+    return problems
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """
+    Compare medians against the baseline.
+
+    A case only regresses when both its median and its min are slower than
+    baseline by more than `threshold`: a slow median alone is usually
+    scheduler noise, while noise rarely makes the fastest round slower.
+    """
+    base_by_name = {b["name"]: b for b in baseline.get("benchmarks", [])}
+    rows = []
+
+    for bench in current["benchmarks"]:
+        base = base_by_name.get(bench["name"])
+        if not base:
+            rows.append({"name": bench["name"], "status": "new", "ratio": None})
+            continue
+
+        ratio = bench["stats"]["median"] / base["stats"]["median"] if base["stats"]["median"] else None
+        min_ratio = bench["stats"]["min"] / base["stats"]["min"] if base["stats"]["min"] else None
+        if ratio is None:
+            status = "n/a"
+        elif ratio > 1 + threshold and (min_ratio is None or min_ratio > 1 + threshold):
+            status = "regressed"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": bench["name"], "status": status, "ratio": ratio})
+
+    # Baseline cases this run should have produced but did not.
+    current_names = {b["name"] for b in current["benchmarks"]}
+    only = current.get("config", {}).get("only")
+    for name, base in base_by_name.items():
+        if name not in current_names and (not only or only in base["group"]):
+            rows.append({"name": name, "status": "missing", "ratio": None})
+
+    return rows
+
+
+def print_results(report: dict, comparison: list[dict] | None) -> None:
+    by_name = {row["name"]: row for row in comparison or []}
+
+    print(f"{'benchmark':<48} {'median_us':>12} {'mean_us':>12} {'stddev_us':>12} {'rounds':>7} {'iters':>7}  compare")
+    for bench in report["benchmarks"]:
+        s = bench["stats"]
+        row = by_name.get(bench["name"])
+        note = ""
+        if row:
+            note = row["status"] if row["ratio"] is None else f"{row['status']} (x{row['ratio']:.2f})"
+        print(
+            f"{bench['name']:<48} {s['median'] * 1e6:>12.1f} {s['mean'] * 1e6:>12.1f} "
+            f"{s['stddev'] * 1e6:>12.1f} {s['rounds']:>7} {s.get('iterations', 1):>7}  {note}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CPU-bound resume processing stages.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per case")
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    parser.add_argument("--min-round-time", type=float, default=MIN_ROUND_TIME, help="Minimum seconds per timed round (inner loop is calibrated to it)")
+    parser.add_argument("--only", default=None, help="Run only groups containing this substring")
+    parser.add_argument("--json", default=None, help="Write results to this path ('-' for stdout)")
+    parser.add_argument("--save", default=None, help="Store results as a baseline at this path")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed median slowdown (0.2 = 20%%)")
+    parser.add_argument("--allow-mismatch", action="store_true", help="Only warn when config/machine info differs from the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_benchmarks(args.seed, sizes, args.min_time, args.max_rounds, args.only, args.min_round_time)
+
+    comparison = None
+    mismatches: list[str] = []
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        mismatches = environment_mismatches(report, baseline)
+        comparison = compare(report, baseline, args.threshold)
+        suspects = {row["name"] for row in comparison if row["status"] == "regressed"}
+        if suspects:
+            remeasure(report, suspects, args.min_round_time)
+            comparison = compare(report, baseline, args.threshold)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "threshold": args.threshold,
+            "mismatches": mismatches,
+            "results": comparison,
+        }
+
+    payload = json.dumps(report, indent=2)
+    for path in (args.json, args.save):
+        if path == "-":
+            sys.stdout.write(payload + "\n")
+        elif path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(payload, encoding="utf-8")
+
+    if args.json != "-":
+        print_results(report, comparison)
+
+    failed = False
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    if mismatches:
+        print(f"\nBaseline was recorded under different settings ({'warning' if args.allow_mismatch else 'error'}):", file=out)
+        for problem in mismatches:
+            print(f"  {problem}", file=out)
+        failed = failed or not args.allow_mismatch
+
+    missing = [row["name"] for row in comparison or [] if row["status"] == "missing"]
+    if missing:
+        print(f"\n{len(missing)} baseline benchmark(s) missing from this run: {', '.join(missing)}", file=out)
+        failed = True
+
+    regressed = [row["name"] for row in comparison or [] if row["status"] == "regressed"]
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed beyond {args.threshold:.0%}: {', '.join(regressed)}", file=out)
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+"""Concurrency check and throughput benchmark for `app.ledger`.
+
+Several processes, each with several threads, hammer a shared ledger with
+grants, reserve/commit and reserve/refund cycles (plus idempotent replays).
+At the end every balance must equal initial + grants - committed charges,
+and must agree with the audit trail in the `entries` table; any difference
+is a lost or duplicated update.
+
+    uv run python -m tools.ledger_stress --processes 4 --threads 8 --ops 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+INITIAL_CREDITS = 1_000
+
+
+def hammer(db_path: str, users: list[str], threads: int, ops: int, seed: int) -> dict:
+    """Run grant and reserve/commit/refund cycles from `threads` threads; returns per-user totals."""
+    from app.ledger import CreditLedger
+
+    ledger = CreditLedger(db_path)
+    granted = {u: 0 for u in users}
+    committed = {u: 0 for u in users}
+    counts = {"ops": 0, "rejected": 0}
+    lock = threading.Lock()
+
+    def run(thread_seed: int) -> None:
+        rng = random.Random(thread_seed)
+        local_granted = {u: 0 for u in users}
+        local_committed = {u: 0 for u in users}
+        local_ops = local_rejected = 0
+
+        for _ in range(ops):
+            user = rng.choice(users)
+            roll = rng.random()
+
+            if roll < 0.1:
+                key = f"grant:{uuid.uuid4().hex}"
+                ledger.grant(user, 5, key)
+                ledger.grant(user, 5, key)  # replay must not double-grant
+                local_granted[user] += 5
+                local_ops += 2
+                continue
+
+            cost = rng.randint(1, 5)
+            key = f"charge:{uuid.uuid4().hex}"
+            local_ops += 1
+            if not ledger.reserve(user, cost, key):
+                local_rejected += 1
+                continue
+
+            if roll < 0.8:
+                ledger.commit(key)
+                ledger.commit(key)  # replay
+                local_committed[user] += cost
+            else:
+                ledger.refund(key)
+                ledger.refund(key)  # replay must not double-refund
+            local_ops += 2
+
+        with lock:
+            for u in users:
+                granted[u] += local_granted[u]
+                committed[u] += local_committed[u]
+            counts["ops"] += local_ops
+            counts["rejected"] += local_rejected
+
+    pool = [threading.Thread(target=run, args=(seed * 1000 + i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    ledger.close()
+    return {"granted": granted, "committed": committed, **counts}
+
+
+def audit_balances(db_path: str, users: list[str]) -> dict[str, int]:
+    """Balances recomputed from the `entries` audit trail (grants minus unrefunded holds)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            u: conn.execute(
+                "SELECT COALESCE(SUM(CASE WHEN kind = 'grant' THEN amount "
+                "WHEN status != 'refunded' THEN -amount ELSE 0 END), 0) FROM entries WHERE user_id = ?",
+                (u,),
+            ).fetchone()[0]
+            for u in users
+        }
+    finally:
+        conn.close()
+
+
+def pending_holds(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM entries WHERE status = 'reserved'").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stress the credit ledger across processes and check for lost updates.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="Threads per process")
+    parser.add_argument("--ops", type=int, default=1000, help="Operations per thread")
+    parser.add_argument("--users", type=int, default=4, help="Fewer users means more contention")
+    parser.add_argument("--db", default=None, help="Ledger path (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    from app.ledger import CreditLedger
+
+    tmp = None
+    if args.db:
+        db_path = args.db
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="ledger-stress-")
+        db_path = os.path.join(tmp.name, "credits.db")
+
+    users = [f"user-{i}" for i in range(args.users)]
+    setup = CreditLedger(db_path)
+    start_balance = {u: setup.balance(u) for u in users}
+    for u in users:
+        setup.grant(u, INITIAL_CREDITS, f"stress-setup:{uuid.uuid4().hex}")
+    setup.close()
+
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(hammer, db_path, users, args.threads, args.ops, seed)
+            for seed in range(args.processes)
+        ]
+        results = [f.result() for f in futures]
+    wall_s = time.perf_counter() - wall_start
+
+    check = CreditLedger(db_path)
+    audit = audit_balances(db_path, users)
+    failures = 0
+    total_ops = sum(r["ops"] for r in results)
+
+    for u in users:
+        expected = start_balance[u] + INITIAL_CREDITS
+        expected += sum(r["granted"][u] for r in results)
+        expected -= sum(r["committed"][u] for r in results)
+
+        actual = check.balance(u)
+        status = "ok" if actual == expected == audit[u] else "MISMATCH"
+        failures += status != "ok"
+        print(f"{u}: balance={actual} expected={expected} audit={audit[u]} {status}")
+
+    check.close()
+    if tmp:
+        tmp.cleanup()
+
+    print(
+        f"processes={args.processes} threads={args.threads} ops={total_ops} "
+        f"rejected={sum(r['rejected'] for r in results)} wall={wall_s:.2f}s "
+        f"throughput={total_ops / wall_s:.0f} ops/s"
+    )
+    if failures:
+        print(f"{failures} account(s) lost or duplicated updates")
+        return 1
+    print("No lost updates.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
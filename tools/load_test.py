@@ -0,0 +1,372 @@
+"""Offline load driver for the app and the analyzer.
+
+Starts `tools.mock_openai` in a subprocess, points the OpenAI client at it and
+runs N concurrent simulated sessions, either straight through `analyze_resume`
+or through `run_app` via Streamlit's `AppTest`.
+
+    uv run python -m tools.load_test --mode both --sessions 200 --concurrency 20 \
+        --latency lognormal:400,0.5 --rate-429 0.05
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from tools.corpus import generate_resume
+
+APP_PURCHASE = 10
+APP_ANALYZE_COST = 2
+APP_REWRITE_COST = 5
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(name: str, latencies_ms: list[float], errors: int, wall_s: float, memory_kb: dict, extra: dict | None = None) -> dict:
+    ordered = sorted(latencies_ms)
+    sessions = len(latencies_ms) + errors
+
+    summary = {
+        "mode": name,
+        "sessions": sessions,
+        "ok": len(latencies_ms),
+        "errors": errors,
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(sessions / wall_s, 2) if wall_s > 0 else None,
+        "latency_ms": {
+            "p50": _round(percentile(ordered, 0.50)),
+            "p95": _round(percentile(ordered, 0.95)),
+            "p99": _round(percentile(ordered, 0.99)),
+            "max": _round(ordered[-1] if ordered else None),
+        },
+        "memory_kb": memory_kb,
+    }
+    summary.update(extra or {})
+    return summary
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+def start_mock_process(latency: str, rate_429: float, seed: int) -> tuple[subprocess.Popen, str]:
+    # Out of process, so the mock's allocations never show up in tracemalloc.
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "tools.mock_openai",
+            "--port", "0", "--latency", latency, "--rate-429", str(rate_429), "--seed", str(seed),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline().strip()
+    if not line.startswith("Mock OpenAI listening on "):
+        proc.kill()
+        raise RuntimeError(f"Mock server failed to start: {line!r}")
+    return proc, line.rsplit(" ", 1)[-1]
+
+
+def fetch_mock_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def run_analyzer_sessions(sessions: int, concurrency: int, resume_text: str, job_role: str | None, trace_memory: bool) -> dict:
+    from app.analyzer import analyze_resume
+    from app.prompts import build_analyze_prompt
+    from app.ui import parse_analysis_output
+
+    latencies: list[float] = []
+    errors = 0
+    contract_violations = 0
+    lock = threading.Lock()
+
+    def one_session(_: int) -> None:
+        nonlocal errors, contract_violations
+
+        def work():
+            prompt = build_analyze_prompt(resume_text=resume_text, job_role=job_role)
+            return parse_analysis_output(analyze_resume(prompt, temperature=0.3))
+
+        start = time.perf_counter()
+        try:
+            parsed = work()
+        except Exception:
+            with lock:
+                errors += 1
+            return
+
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if parsed["primary_score"] is None:
+                contract_violations += 1
+
+    if trace_memory:
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_session, range(sessions)))
+    wall_s = time.perf_counter() - wall_start
+
+    # Threads share one tracemalloc counter, so only a whole-run figure is
+    # honest here: the peak above baseline, spread over the concurrent sessions.
+    memory_kb = {}
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        run_peak = max(0, peak - baseline) / 1024
+        memory_kb = {
+            "run_peak": _round(run_peak),
+            "run_peak_per_concurrent_session": _round(run_peak / min(concurrency, sessions)),
+        }
+
+    return summarize("analyzer", latencies, errors, wall_s, memory_kb, {"contract_violations": contract_violations})
+
+
+def _app_session_script(resume_text: str) -> None:
+    # Runs inside AppTest's script runner, so it must be self-contained.
+    import streamlit as st
+
+    from app.ui import run_app
+
+    class _Upload:
+        type = "text/plain"
+        name = "resume.txt"
+
+        def getvalue(self) -> bytes:
+            return resume_text.encode("utf-8")
+
+    st.file_uploader = lambda *args, **kwargs: _Upload()
+    run_app()
+
+
+def _warm_app_worker() -> None:
+    # Import heavy modules up front so tracemalloc figures reflect the session,
+    # not the one-off import cost of the worker.
+    import streamlit.testing.v1  # noqa: F401
+
+    import app.ui  # noqa: F401
+
+
+def _app_session(
+    user_id: str, resume_text: str, job_role: str, timeout_s: float, trace_memory: bool
+) -> tuple[float, str, int, int | None]:
+    """Run one session; returns (elapsed_ms, user_id, net credit change it caused, peak bytes)."""
+    # AppTest drives a process-global Streamlit runtime, so each simulated
+    # session runs in its own worker process rather than a thread.
+    from streamlit.testing.v1 import AppTest
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    try:
+        at = AppTest.from_function(_app_session_script, kwargs={"resume_text": resume_text}, default_timeout=timeout_s)
+        # All workers share one CREDITS_DB; sessions that share a uid act as
+        # concurrent tabs of one user and contend for the same balance.
+        at.query_params["uid"] = user_id
+        at.run()
+
+        at.button(key="buy_credits_main").click().run()
+
+        at.text_input(key="job_role_analyze").input(job_role).run()
+        at.button(key="analyze_btn").click().run()
+        analyzed = at.session_state["analysis_result"] is not None
+
+        at.text_input(key="job_role_rewrite").input(job_role).run()
+        at.button(key="rewrite_btn").click().run()
+        rewritten = at.session_state["rewrite_full"] is not None
+
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+        net = APP_PURCHASE
+        net -= APP_ANALYZE_COST if analyzed else 0
+        net -= APP_REWRITE_COST if rewritten else 0
+        elapsed = (time.perf_counter() - start) * 1000
+
+        mem = None
+        if trace_memory:
+            _, mem = tracemalloc.get_traced_memory()
+        return elapsed, user_id, net, mem
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def run_app_sessions(
+    sessions: int,
+    concurrency: int,
+    resume_text: str,
+    job_role: str,
+    timeout_s: float,
+    trace_memory: bool,
+    shared_users: int = 0,
+) -> dict:
+    """
+    Run `sessions` AppTest sessions; with `shared_users`, they are spread
+    round-robin over that many uids instead of one uid each.
+
+    Each account's final balance must equal the sum of the purchases and
+    successful charges its sessions made; any difference is a ledger mismatch.
+    """
+    from app.ledger import get_ledger
+
+    run_id = uuid.uuid4().hex[:8]
+    if shared_users > 0:
+        user_ids = [f"{run_id}-user-{i % shared_users}" for i in range(sessions)]
+    else:
+        user_ids = [f"{run_id}-session-{i}" for i in range(sessions)]
+
+    latencies: list[float] = []
+    mem_samples: list[int] = []
+    errors = 0
+    expected: dict[str, int | None] = {}
+
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=concurrency,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_app_worker,
+    ) as pool:
+        # Resolve the worker through the package path: AppTest swaps out
+        # __main__ in the workers, so functions pickled as __main__.* break.
+        session_fn = importlib.import_module("tools.load_test")._app_session
+        futures = {
+            pool.submit(session_fn, user_id, resume_text, job_role, timeout_s, trace_memory): user_id
+            for user_id in user_ids
+        }
+
+        for future in as_completed(futures):
+            try:
+                elapsed, user_id, net, mem = future.result()
+            except Exception:
+                # The session may have bought or spent credits before failing,
+                # so its account can no longer be checked.
+                errors += 1
+                expected[futures[future]] = None
+                continue
+
+            latencies.append(elapsed)
+            if mem is not None:
+                mem_samples.append(mem)
+            if expected.get(user_id, 0) is not None:
+                expected[user_id] = expected.get(user_id, 0) + net
+    wall_s = time.perf_counter() - wall_start
+
+    ledger = get_ledger()
+    checked = {user_id: net for user_id, net in expected.items() if net is not None}
+    ledger_mismatches = sum(ledger.balance(user_id) != net for user_id, net in checked.items())
+
+    memory_kb = {}
+    if mem_samples:
+        memory_kb = {
+            "per_session_peak_mean": _round(sum(mem_samples) / len(mem_samples) / 1024),
+            "per_session_peak_p95": _round(percentile(sorted(mem_samples), 0.95) / 1024),
+        }
+
+    return summarize(
+        "app",
+        latencies,
+        errors,
+        wall_s,
+        memory_kb,
+        {"ledger_accounts": len(checked), "ledger_mismatches": ledger_mismatches},
+    )
+
+
+def print_report(results: list[dict], mock_stats: dict) -> None:
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"== {r['mode']} ==")
+        print(f"sessions={r['sessions']} ok={r['ok']} errors={r['errors']} wall={r['wall_s']}s throughput={r['throughput_rps']}/s")
+        print(f"latency_ms p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+        if r["memory_kb"]:
+            print("memory_kb " + " ".join(f"{k}={v}" for k, v in r["memory_kb"].items()))
+        for key in ("contract_violations", "ledger_accounts", "ledger_mismatches"):
+            if key in r:
+                print(f"{key}={r[key]}")
+    print(f"== mock server == {mock_stats}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test against a mock OpenAI server.")
+    parser.add_argument("--mode", choices=["analyzer", "app", "both"], default="both")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", default="lognormal:300,0.4")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--job-role", default="Backend Engineer")
+    parser.add_argument("--resume-chars", type=int, default=2500, help="Size of the synthetic resume each session submits")
+    parser.add_argument("--app-timeout", type=float, default=30.0, help="Per-run AppTest timeout in seconds")
+    parser.add_argument("--shared-users", type=int, default=0, help="App mode: spread sessions over this many uids, so concurrent sessions share a balance (0 = one uid per session)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc; tracing slows sessions noticeably, so use this for latency-accurate runs")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args(argv)
+
+    mock_proc, base_url = start_mock_process(args.latency, args.rate_429, args.seed)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+    ledger_dir = tempfile.TemporaryDirectory(prefix="loadtest-ledger-")
+    os.environ["CREDITS_DB"] = os.path.join(ledger_dir.name, "credits.db")
+
+    resume_text = generate_resume(random.Random(args.seed), args.resume_chars)
+
+    results = []
+    try:
+        if args.mode in ("analyzer", "both"):
+            results.append(run_analyzer_sessions(args.sessions, args.concurrency, resume_text, args.job_role, not args.no_memory))
+        if args.mode in ("app", "both"):
+            results.append(
+                run_app_sessions(
+                    args.sessions,
+                    args.concurrency,
+                    resume_text,
+                    args.job_role,
+                    args.app_timeout,
+                    not args.no_memory,
+                    args.shared_users,
+                )
+            )
+    finally:
+        mock_stats = fetch_mock_stats(base_url)
+        mock_proc.terminate()
+        mock_proc.wait()
+        ledger_dir.cleanup()
+
+    if args.json:
+        print(json.dumps({"results": results, "mock": mock_stats}, indent=2))
+    else:
+        print_report(results, mock_stats)
+
+    failed = any(r["errors"] or r.get("contract_violations") or r.get("ledger_mismatches") for r in results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,426 @@
+"""Streaming analytics over the rotated `logs/app.log*` files.
+
+Reads app.log.3 -> app.log.2 -> app.log.1 -> app.log in one pass, pairs
+`openai_request_start` / `openai_request_end` / `openai_usage` records and
+prints latency percentiles, tokens per minute, error rates by category and
+cost estimates for a time window. Memory is bounded: latencies go into a
+fixed log-scale histogram and unmatched requests into a capped table.
+
+    uv run python -m tools.log_stats --since 2h
+    uv run python -m tools.log_stats --since "2026-10-19 09:00" --until "2026-10-19 18:00" --json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.errors import LLM_ERROR_CATEGORIES, classify_llm_error
+from app.logger import LOG_FILE
+
+BACKUP_COUNT = 3
+MAX_PENDING = 10_000
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) \| (\w+) \| [^|]+ \| (.*)$")
+RELATIVE_RE = re.compile(r"^(\d+)([smhd])$")
+
+# USD per 1M tokens (input, output). Override with --price MODEL=IN,OUT.
+MODEL_PRICES_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+class LatencyHistogram:
+    """Log-scale buckets (~2% wide) from 1 ms to ~1 hour; percentiles within one bucket width."""
+
+    GROWTH = 1.02
+    BUCKETS = int(math.log(3_600_000) / math.log(GROWTH)) + 2
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        idx = 0 if ms <= 1 else min(self.BUCKETS - 1, int(math.log(ms) / math.log(self.GROWTH)) + 1)
+        self.counts[idx] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.total:
+            return None
+        target = max(1, math.ceil(q * self.total))
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.max_ms, self.GROWTH ** idx)
+        return self.max_ms
+
+
+class WindowStats:
+    def __init__(self, prices: dict[str, tuple[float, float]]):
+        self.prices = prices
+        self.latency = LatencyHistogram()
+        self.latency_by_model: dict[str, LatencyHistogram] = {}
+        self.started = 0
+        self.completed = 0
+        self.truncated = 0
+        self.errors = {category: 0 for category in LLM_ERROR_CATEGORIES}
+        self.tokens = {"prompt": 0, "completion": 0}
+        self.tokens_by_model: dict[str, list[int]] = {}
+        self.unpaired = 0
+        self.first_ts: datetime | None = None
+        self.last_ts: datetime | None = None
+        self._minute: datetime | None = None
+        self._minute_tokens = 0
+        self.peak_tokens_per_minute = 0
+
+    def saw(self, ts: datetime) -> None:
+        if self.first_ts is None or ts < self.first_ts:
+            self.first_ts = ts
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def add_latency(self, model: str, ms: float) -> None:
+        self.completed += 1
+        self.latency.add(ms)
+        self.latency_by_model.setdefault(model, LatencyHistogram()).add(ms)
+
+    def add_tokens(self, ts: datetime, model: str, prompt: int, completion: int) -> None:
+        self.tokens["prompt"] += prompt
+        self.tokens["completion"] += completion
+        per_model = self.tokens_by_model.setdefault(model, [0, 0])
+        per_model[0] += prompt
+        per_model[1] += completion
+
+        minute = ts.replace(second=0, microsecond=0)
+        if minute != self._minute:
+            self._minute, self._minute_tokens = minute, 0
+        self._minute_tokens += prompt + completion
+        self.peak_tokens_per_minute = max(self.peak_tokens_per_minute, self._minute_tokens)
+
+    def cost(self) -> tuple[float, list[str]]:
+        total = 0.0
+        unpriced = []
+        for model, (prompt, completion) in self.tokens_by_model.items():
+            price = self.prices.get(model)
+            if price is None:
+                unpriced.append(model)
+                continue
+            total += prompt / 1e6 * price[0] + completion / 1e6 * price[1]
+        return total, unpriced
+
+    def report(self) -> dict:
+        minutes = None
+        if self.first_ts and self.last_ts:
+            minutes = max(1.0, (self.last_ts - self.first_ts).total_seconds() / 60)
+        total_tokens = self.tokens["prompt"] + self.tokens["completion"]
+        failed = sum(self.errors.values())
+        cost, unpriced = self.cost()
+
+        def pct(h: LatencyHistogram) -> dict:
+            return {q: _round(h.percentile(v)) for q, v in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99))} | {
+                "max": _round(h.max_ms if h.total else None),
+                "count": h.total,
+            }
+
+        return {
+            "window": {
+                "first": self.first_ts.isoformat(sep=" ") if self.first_ts else None,
+                "last": self.last_ts.isoformat(sep=" ") if self.last_ts else None,
+                "minutes": _round(minutes),
+            },
+            "requests": {
+                "started": self.started,
+                "completed": self.completed,
+                "failed": failed,
+                "truncated": self.truncated,
+                "unpaired": self.unpaired,
+            },
+            "latency_ms": pct(self.latency),
+            "latency_ms_by_model": {m: pct(h) for m, h in sorted(self.latency_by_model.items())},
+            "tokens": {
+                **self.tokens,
+                "total": total_tokens,
+                "per_minute": _round(total_tokens / minutes) if minutes else None,
+                "peak_per_minute": self.peak_tokens_per_minute,
+            },
+            "errors": {
+                category: {"count": count, "rate": _round(count / self.started, 4) if self.started else None}
+                for category, count in self.errors.items()
+            },
+            "cost_usd": {
+                "total": round(cost, 4),
+                "by_model": {
+                    m: round(p / 1e6 * self.prices[m][0] + c / 1e6 * self.prices[m][1], 4)
+                    for m, (p, c) in sorted(self.tokens_by_model.items())
+                    if m in self.prices
+                },
+                "unpriced_models": unpriced,
+            },
+        }
+
+
+def _round(value: float | None, digits: int = 1) -> float | None:
+    return None if value is None else round(value, digits)
+
+
+def parse_fields(message: str) -> tuple[str, dict]:
+    event, *parts = [p.strip() for p in message.split(" | ")]
+    fields = {}
+    for part in parts:
+        key, sep, value = part.partition("=")
+        if sep:
+            fields[key] = value
+    return event, fields
+
+
+def _int(value: str | None) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class RequestPairer:
+    """
+    Joins start / end / usage / failure records into per-request outcomes.
+
+    Records carry a request_id; older logs without one are paired FIFO per
+    model, with usage attributed to the most recent end record.
+    """
+
+    def __init__(self, stats: WindowStats, max_pending: int = MAX_PENDING):
+        self.stats = stats
+        self.max_pending = max_pending
+        self.pending: OrderedDict[str, str] = OrderedDict()  # request_id -> model
+        self.legacy_seq = 0
+        self.last_model = "unknown"
+        self.awaiting_traceback = False
+        self.last_continuation = ""
+
+    def _open(self, request_id: str, model: str) -> None:
+        self.pending[request_id] = model
+        if len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+            self.stats.unpaired += 1
+
+    def _close(self, request_id: str | None, model: str) -> str:
+        if request_id and request_id != "-":
+            return self.pending.pop(request_id, None) or model
+
+        # Legacy: oldest open request for this model.
+        for key, pending_model in self.pending.items():
+            if key.startswith("legacy:") and pending_model == model:
+                del self.pending[key]
+                break
+        return model
+
+    def line(self, ts: datetime, message: str) -> None:
+        self._flush_traceback()
+        event, fields = parse_fields(message)
+        model = fields.get("model", self.last_model)
+        request_id = fields.get("request_id")
+        stats = self.stats
+
+        if event == "openai_request_start":
+            stats.started += 1
+            if not request_id:
+                self.legacy_seq += 1
+                request_id = f"legacy:{self.legacy_seq}"
+            self._open(request_id, model)
+
+        elif event == "openai_request_end":
+            model = self._close(request_id, model)
+            self.last_model = model
+            stats.add_latency(model, float(fields.get("duration_ms") or 0))
+            if fields.get("finish_reason") == "length":
+                stats.truncated += 1
+
+        elif event == "openai_usage":
+            stats.add_tokens(ts, fields.get("model", self.last_model), _int(fields.get("prompt_tokens")), _int(fields.get("completion_tokens")))
+
+        elif event == "openai_request_failed":
+            self._close(request_id, model)
+            category = fields.get("category")
+            if category in stats.errors:
+                stats.errors[category] += 1
+            else:
+                # Older lines carry no category; classify the exception line
+                # at the end of the traceback that follows.
+                self.awaiting_traceback = True
+                self.last_continuation = ""
+
+    def continuation(self, raw: str) -> None:
+        if self.awaiting_traceback and raw.strip():
+            self.last_continuation = raw
+
+    def _flush_traceback(self) -> None:
+        if self.awaiting_traceback:
+            self.stats.errors[classify_llm_error(self.last_continuation)] += 1
+            self.awaiting_traceback = False
+            self.last_continuation = ""
+
+    def finish(self) -> None:
+        self._flush_traceback()
+        self.stats.unpaired += len(self.pending)
+        self.pending.clear()
+
+
+def _open_snapshot(log_file: Path) -> list:
+    """Open app.log and its backups newest-first, skipping duplicates from a rotation during the scan."""
+    handles = []
+    seen = set()
+    for path in [log_file] + [Path(f"{log_file}.{i}") for i in range(1, BACKUP_COUNT + 1)]:
+        try:
+            fh = path.open("r", encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            continue
+        ident = os.fstat(fh.fileno()).st_ino, os.fstat(fh.fileno()).st_dev
+        if ident in seen:
+            fh.close()
+            continue
+        seen.add(ident)
+        handles.append(fh)
+    handles.reverse()  # oldest first
+    return handles
+
+
+def iter_log_lines(log_file: Path = LOG_FILE):
+    """
+    Yield lines across the rotated set, oldest file first.
+
+    Open handles keep reading the same inode even if RotatingFileHandler
+    renames the file underneath, so each file is finished to EOF. If app.log
+    was rotated while we were reading it, the new app.log is read as well.
+    """
+    handles = _open_snapshot(log_file)
+    last_ident = None
+
+    for fh in handles:
+        with fh:
+            last_ident = os.fstat(fh.fileno()).st_ino, os.fstat(fh.fileno()).st_dev
+            yield from fh
+
+    while True:
+        try:
+            fh = log_file.open("r", encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            return
+        with fh:
+            ident = os.fstat(fh.fileno()).st_ino, os.fstat(fh.fileno()).st_dev
+            if ident == last_ident:
+                return
+            last_ident = ident
+            yield from fh
+
+
+def parse_time(value: str | None, now: datetime) -> datetime | None:
+    if not value:
+        return None
+    m = RELATIVE_RE.match(value.strip())
+    if m:
+        unit = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}[m.group(2)]
+        return now - timedelta(**{unit: int(m.group(1))})
+    parsed = datetime.fromisoformat(value.strip())
+    if parsed.tzinfo is not None:
+        # Log timestamps are naive local time.
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def analyze_logs(log_file: Path, since: datetime | None, until: datetime | None, prices: dict) -> dict:
+    stats = WindowStats(prices)
+    pairer = RequestPairer(stats)
+    in_window = False
+
+    for raw in iter_log_lines(log_file):
+        m = LOG_LINE_RE.match(raw.rstrip("\n"))
+        if not m:
+            if in_window:
+                pairer.continuation(raw.rstrip("\n"))
+            continue
+
+        ts = datetime.strptime(m.group(1), TIMESTAMP_FORMAT)
+        in_window = (since is None or ts >= since) and (until is None or ts <= until)
+        if not in_window:
+            continue
+
+        stats.saw(ts)
+        pairer.line(ts, m.group(3))
+
+    pairer.finish()
+    return stats.report()
+
+
+def print_report(report: dict) -> None:
+    w, r, lat, tok = report["window"], report["requests"], report["latency_ms"], report["tokens"]
+    print(f"window: {w['first']} .. {w['last']} ({w['minutes']} min)")
+    print(
+        f"requests: started={r['started']} completed={r['completed']} failed={r['failed']} "
+        f"truncated={r['truncated']} unpaired={r['unpaired']}"
+    )
+    print(f"latency_ms: p50={lat['p50']} p90={lat['p90']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    for model, h in report["latency_ms_by_model"].items():
+        print(f"  {model}: n={h['count']} p50={h['p50']} p95={h['p95']} p99={h['p99']}")
+    print(
+        f"tokens: prompt={tok['prompt']} completion={tok['completion']} total={tok['total']} "
+        f"per_minute={tok['per_minute']} peak_per_minute={tok['peak_per_minute']}"
+    )
+    print("errors:")
+    for category, e in report["errors"].items():
+        print(f"  {category}: {e['count']} ({e['rate'] if e['rate'] is not None else '-'})")
+    cost = report["cost_usd"]
+    print(f"cost_usd: {cost['total']} {cost['by_model']}")
+    if cost["unpriced_models"]:
+        print(f"  no price for: {', '.join(cost['unpriced_models'])} (use --price MODEL=IN,OUT)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency, token, error and cost statistics from the rotated app logs.")
+    parser.add_argument("--log-file", default=str(LOG_FILE), help="Current log file; backups are <file>.1 .. .3")
+    parser.add_argument("--since", default=None, help="ISO time ('2026-10-19 09:00') or relative ('30m', '2h', '7d')")
+    parser.add_argument("--until", default=None, help="ISO time or relative")
+    parser.add_argument("--price", action="append", default=[], metavar="MODEL=IN,OUT", help="USD per 1M input/output tokens")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    prices = dict(MODEL_PRICES_PER_1M)
+    for item in args.price:
+        model, _, raw = item.partition("=")
+        try:
+            prompt_price, completion_price = (float(v) for v in raw.split(","))
+        except ValueError:
+            parser.error(f"Invalid --price value: {item!r}")
+        prices[model.strip()] = (prompt_price, completion_price)
+
+    now = datetime.now()
+    try:
+        since, until = parse_time(args.since, now), parse_time(args.until, now)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = analyze_logs(Path(args.log_file), since, until, prices)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
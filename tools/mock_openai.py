@@ -0,0 +1,401 @@
+"""Local mock of the OpenAI chat-completions endpoint.
+
+Returns bodies that follow the analysis contract from `app.prompts` (or a
+Markdown rewrite), so the whole app can be exercised offline.
+
+    uv run python -m tools.mock_openai --port 8787 --latency lognormal:400,0.5 --rate-429 0.05
+
+then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8787/v1.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+
+TARGET_ROLE_RE = re.compile(r"Target role:\s*(.*)")
+
+
+class LatencyModel:
+    """
+    Latency spec, in milliseconds:
+    - fixed:<ms>
+    - uniform:<low>,<high>
+    - normal:<mean>,<stddev>
+    - lognormal:<median>,<sigma>
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "fixed:0", seed: int | None = None):
+        kind, _, raw_args = spec.partition(":")
+        kind = kind.strip().lower()
+
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind!r} (expected one of {self.KINDS})")
+
+        try:
+            args = [float(a) for a in raw_args.split(",") if a.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec!r}") from None
+
+        expected = 1 if kind == "fixed" else 2
+        if len(args) != expected:
+            raise ValueError(f"Latency spec {spec!r} needs {expected} argument(s)")
+
+        self.spec = spec
+        self.kind = kind
+        self.args = args
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.args[0]
+            elif self.kind == "uniform":
+                value = self._rng.uniform(*self.args)
+            elif self.kind == "normal":
+                value = self._rng.gauss(*self.args)
+            else:
+                median, sigma = self.args
+                value = self._rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+
+        return max(0.0, value)
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        rate_429: float = 0.0,
+        retry_after_ms: int = 50,
+        stream_chunk_chars: int = 40,
+        seed: int | None = None,
+    ):
+        if not 0.0 <= rate_429 <= 1.0:
+            raise ValueError("rate_429 must be between 0 and 1")
+
+        self.latency = LatencyModel(latency, seed=seed)
+        self.rate_429 = rate_429
+        self.retry_after_ms = retry_after_ms
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_throttle(self) -> bool:
+        if self.rate_429 <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.rate_429
+
+    def score(self) -> int:
+        with self._lock:
+            return self._rng.randint(40, 95)
+
+
+class MockStats:
+    def __init__(self):
+        self.requests = 0
+        self.completed = 0
+        self.throttled = 0
+        self.streamed = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, **deltas: int) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "completed": self.completed,
+                "throttled": self.throttled,
+                "streamed": self.streamed,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text or "") / CHARS_PER_TOKEN))
+
+
+def _target_role(prompt: str) -> str | None:
+    m = TARGET_ROLE_RE.search(prompt)
+    if not m:
+        return None
+    role = m.group(1).strip()
+    if role in ("N/A", "general job applications"):
+        return None
+    return role
+
+
+def build_analysis_body(prompt: str, score: int) -> str:
+    role = _target_role(prompt)
+    label = "Role match" if role else "Professionalism"
+
+    lines = [
+        f"PRIMARY_LABEL: {label}",
+        f"PRIMARY_SCORE: {score}",
+        "STRUCTURE_NOTE: Sections are in a conventional order, but the summary is generic and bullets mix duties with outcomes.",
+    ]
+    if role:
+        lines.append(f"STRUCTURE_SCORE: {min(100, score + 5)}")
+
+    lines += [
+        "",
+        "TOP_ISSUES:",
+        "- Experience bullets describe responsibilities rather than results.",
+        "- Skills section lists tools without showing where they were used.",
+        "- Summary does not state the level or focus of the candidate.",
+        "",
+        "QUICK_WINS:",
+        "- Start each bullet with a strong action verb.",
+        "- Move the most relevant project above older roles.",
+        "- Group skills by category (languages, frameworks, tooling).",
+        "",
+        f"REWRITE_RECOMMENDATION: {'Role-targeted' if role else 'Professional'}",
+        f"REWRITE_REASON: {'Aligning wording with the ' + role + ' role would raise the match.' if role else 'Tighter wording would make the resume read more professionally.'}",
+    ]
+    return "\n".join(lines)
+
+
+def build_rewrite_body(prompt: str) -> str:
+    role = _target_role(prompt) or "General"
+    resume = prompt.split("Resume content:", 1)[-1].strip()
+
+    # Echo the resume back as bullets so the rewrite scales with input size,
+    # like a real rewrite does.
+    bullets = [f"- {line.strip()}" for line in resume.splitlines() if line.strip()]
+
+    return "\n".join(
+        [
+            "# Rewritten Resume",
+            "",
+            "## Summary",
+            f"Candidate targeting: {role}.",
+            "",
+            "## Experience",
+            *bullets,
+            "",
+            "## Skills",
+            "- Communication, ownership, delivery",
+        ]
+    )
+
+
+def build_completion_text(prompt: str, score: int) -> str:
+    if "Rewrite the following resume" in prompt:
+        return build_rewrite_body(prompt)
+    return build_analysis_body(prompt, score)
+
+
+def truncate_to_tokens(text: str, max_tokens: int | None) -> tuple[str, str]:
+    if max_tokens is None:
+        return text, "stop"
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text, "stop"
+    return text[:limit], "length"
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    server: "MockOpenAIServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # keep load-test output clean
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.server.stats.snapshot())
+            return
+        self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        stats = self.server.stats
+        stats.add(requests=1)
+
+        if config.should_throttle():
+            stats.add(throttled=1)
+            self._send_json(
+                429,
+                {
+                    "error": {
+                        "message": "Rate limit reached for requests (mock).",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                headers={"retry-after-ms": str(config.retry_after_ms)},
+            )
+            return
+
+        time.sleep(config.latency.sample_ms() / 1000)
+
+        messages = payload.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        user_prompt = str(messages[-1].get("content") or "") if messages else ""
+        model = payload.get("model") or "gpt-4o-mini"
+
+        text, finish_reason = truncate_to_tokens(
+            build_completion_text(user_prompt, config.score()),
+            payload.get("max_tokens") or payload.get("max_completion_tokens"),
+        )
+
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        stats.add(
+            completed=1,
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+        )
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if payload.get("stream"):
+            stats.add(streamed=1)
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            self._stream(completion_id, created, model, text, finish_reason, usage if include_usage else None)
+            return
+
+        self._send_json(
+            200,
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _stream(self, completion_id, created, model, text, finish_reason, usage) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta: dict, finish: str | None = None, with_usage: dict | None = None) -> None:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if delta is not None else [],
+            }
+            if with_usage is not None:
+                event["usage"] = with_usage
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        step = self.server.config.stream_chunk_chars
+        chunk({"role": "assistant", "content": ""})
+        for i in range(0, len(text), step):
+            chunk({"content": text[i : i + step]})
+        chunk({}, finish=finish_reason)
+        if usage is not None:
+            chunk(None, with_usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: MockConfig):
+        super().__init__(address, MockOpenAIHandler)
+        self.config = config
+        self.stats = MockStats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> MockOpenAIServer:
+    server = MockOpenAIServer((host, port), config or MockConfig())
+    thread = threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock OpenAI chat-completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:<ms> | uniform:<lo>,<hi> | normal:<mean>,<sd> | lognormal:<median>,<sigma>")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after-ms", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        retry_after_ms=args.retry_after_ms,
+        seed=args.seed,
+    )
+    server = MockOpenAIServer((args.host, args.port), config)
+    print(f"Mock OpenAI listening on {server.base_url}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()